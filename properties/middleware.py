@@ -0,0 +1,18 @@
+from .utils import activate_request_cache, clear_request_cache
+
+
+class ClearRequestCacheMiddleware:
+    """
+    Scope the properties request cache to a single request
+    Values memoized by the property utils are dropped once the response is built
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        activate_request_cache()
+        try:
+            return self.get_response(request)
+        finally:
+            clear_request_cache()
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-15 00:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='property',
+            name='title',
+            field=models.CharField(max_length=200, unique=True),
+        ),
+    ]
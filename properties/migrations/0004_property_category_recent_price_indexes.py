@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-15 00:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0003_property_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['category', '-created_at'], name='prop_category_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['price_per_night'], name='prop_price_idx'),
+        ),
+    ]
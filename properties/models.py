@@ -1,6 +1,14 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils import timezone
 
+# Full-text search expression; queries must use this exact expression for
+# Postgres to match it against the prop_search_idx expression index
+PROPERTY_SEARCH_CONFIG = 'english'
+PROPERTY_SEARCH_VECTOR = SearchVector('title', 'description', 'country', config=PROPERTY_SEARCH_CONFIG)
+
 class Property(models.Model):
     PROPERTY_CATEGORIES = [
         ('house', 'House'),
@@ -10,7 +18,7 @@ class Property(models.Model):
         ('cottage', 'Cottage'),
     ]
     
-    title = models.CharField(max_length=200)
+    title = models.CharField(max_length=200, unique=True)
     description = models.TextField()
     price_per_night = models.DecimalField(max_digits=10, decimal_places=2)
     bedrooms = models.IntegerField()
@@ -27,6 +35,22 @@ class Property(models.Model):
     class Meta:
         verbose_name_plural = "Properties"
         ordering = ['-created_at']
+        # Match the predicates used by utils.get_properties_by_filters
+        indexes = [
+            models.Index(fields=['category', 'price_per_night'], name='prop_category_price_idx'),
+            models.Index(fields=['category', '-created_at'], name='prop_category_recent_idx'),
+            models.Index(fields=['price_per_night'], name='prop_price_idx'),
+            models.Index(fields=['-created_at'], name='prop_created_at_idx'),
+            models.Index(
+                fields=['-created_at'],
+                condition=models.Q(favorited=True),
+                name='prop_fav_recent_idx',
+            ),
+            # country__icontains compiles to UPPER(country) LIKE UPPER(%s), so the
+            # trigram index has to be on the same UPPER() expression to be used
+            GinIndex(OpClass(Upper('country'), name='gin_trgm_ops'), name='prop_country_trgm_idx'),
+            GinIndex(PROPERTY_SEARCH_VECTOR, name='prop_search_idx'),
+        ]
     
     def __str__(self):
         return self.title
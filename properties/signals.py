@@ -1,7 +1,8 @@
+from django.db import transaction
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.core.cache import cache
 from .models import Property
+from .utils import clear_properties_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,34 +10,34 @@ logger = logging.getLogger(__name__)
 @receiver(post_save, sender=Property)
 def clear_properties_cache_on_save(sender, instance, **kwargs):
     """
-    Clear the properties cache when a Property is saved
+    Clear the properties cache once the transaction saving a Property commits
+    Clearing earlier would let a concurrent request cache the pre-write rows
+    again before the write is visible
     """
-    try:
-        cache.delete('all_properties')
-        logger.debug(f"Properties cache cleared after save of Property {instance.id}")
-    except Exception as e:
-        logger.error(f"Error clearing cache on save: {e}")
+    property_id = instance.id
+
+    def clear():
+        try:
+            clear_properties_cache(property_id=property_id)
+            logger.debug(f"Properties cache cleared after save of Property {property_id}")
+        except Exception as e:
+            logger.error(f"Error clearing cache on save: {e}")
+
+    transaction.on_commit(clear)
 
 @receiver(post_delete, sender=Property)
 def clear_properties_cache_on_delete(sender, instance, **kwargs):
     """
-    Clear the properties cache when a Property is deleted
+    Clear the properties cache once the transaction deleting a Property commits
     """
-    try:
-        cache.delete('all_properties')
-        logger.debug(f"Properties cache cleared after delete of Property {instance.id}")
-    except Exception as e:
-        logger.error(f"Error clearing cache on delete: {e}")
+    # Read now: the deleted instance's id is reset to None after post_delete
+    property_id = instance.id
 
-# Additional signal handlers for related models if needed
-@receiver(post_save)
-@receiver(post_delete)
-def clear_cache_on_related_changes(sender, **kwargs):
-    """
-    Clear cache when related models change (optional)
-    You can add specific logic here for models that affect properties
-    """
-    # Add logic to determine if this model affects properties
-    # For example, if you have Booking model that references Property
-    # you might want to clear cache when bookings change
-    pass
+    def clear():
+        try:
+            clear_properties_cache(property_id=property_id)
+            logger.debug(f"Properties cache cleared after delete of Property {property_id}")
+        except Exception as e:
+            logger.error(f"Error clearing cache on delete: {e}")
+
+    transaction.on_commit(clear)
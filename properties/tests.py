@@ -0,0 +1,423 @@
+import csv
+import gzip
+import os
+import tempfile
+import time
+from decimal import Decimal
+from unittest import mock
+
+import orjson
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django_redis.exceptions import ConnectionInterrupted
+
+from .models import Property
+from .utils import (
+    ALL_PROPERTIES_LOCK_KEY,
+    ALL_PROPERTIES_SHARD_KEYS,
+    ALL_PROPERTIES_STALE_KEY,
+    COUNTRY_CODE_SOFT_TIMEOUT,
+    PROPERTY_SHARD_COUNT,
+    PropertyListBodyStream,
+    _build_property_shards,
+    _country_code_cache_key,
+    _property_shard_key,
+    _refresh_country_code,
+    acquire_property_list_refill_lock,
+    clear_properties_cache,
+    get_all_properties,
+    get_cached_property_list_body,
+    get_country_code,
+    get_properties_by_filters,
+    get_property_list_generation,
+    import_properties_from_csv,
+    monitor_cache_performance,
+    stream_property_list_body,
+    update_property_favorite_status,
+)
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+CSV_FIELDNAMES = [
+    'title', 'description', 'price_per_night', 'bedrooms', 'bathrooms',
+    'guests', 'country', 'country_code', 'category', 'favorited'
+]
+
+
+def make_property(**overrides):
+    values = {
+        'title': 'Beach House',
+        'description': 'Close to the sea',
+        'price_per_night': Decimal('100.00'),
+        'bedrooms': 2,
+        'bathrooms': 1,
+        'guests': 4,
+        'country': 'Kenya',
+        'country_code': 'KE',
+        'category': 'house',
+    }
+    values.update(overrides)
+    return Property.objects.create(**values)
+
+
+def make_row(**overrides):
+    row = {
+        'title': 'Beach House',
+        'description': 'Close to the sea',
+        'price_per_night': '100.00',
+        'bedrooms': '2',
+        'bathrooms': '1',
+        'guests': '4',
+        'country': 'Kenya',
+        'country_code': 'KE',
+        'category': 'house',
+        'favorited': 'false',
+    }
+    row.update(overrides)
+    return row
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+@mock.patch('properties.utils.clear_properties_cache')
+class ImportPropertiesFromCsvTests(TestCase):
+
+    def import_rows(self, rows):
+        with tempfile.NamedTemporaryFile(
+            'w', suffix='.csv', newline='', encoding='utf-8', delete=False
+        ) as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(rows)
+        self.addCleanup(os.remove, csvfile.name)
+        return import_properties_from_csv(csvfile.name)
+
+    def test_existing_title_is_updated(self, clear_cache):
+        existing = make_property(price_per_night=Decimal('100.00'))
+
+        result = self.import_rows([make_row(price_per_night='150.00', guests='6')])
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['imported_count'], 0)
+        self.assertEqual(Property.objects.count(), 1)
+        existing.refresh_from_db()
+        self.assertEqual(existing.price_per_night, Decimal('150.00'))
+        self.assertEqual(existing.guests, 6)
+        clear_cache.assert_called_once_with()
+
+    def test_duplicate_titles_in_file_keep_last_row(self, clear_cache):
+        result = self.import_rows([
+            make_row(price_per_night='100.00'),
+            make_row(price_per_night='120.00'),
+        ])
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['imported_count'], 1)
+        self.assertEqual(Property.objects.count(), 1)
+        self.assertEqual(Property.objects.get().price_per_night, Decimal('120.00'))
+
+    def test_row_with_missing_field_is_skipped(self, clear_cache):
+        result = self.import_rows([
+            make_row(title='Complete'),
+            make_row(title='Incomplete', guests=''),
+        ])
+
+        self.assertFalse(result['success'])
+        self.assertEqual(result['errors'], ["Row 3: Missing required field 'guests'"])
+        self.assertEqual(result['imported_count'], 1)
+        self.assertQuerySetEqual(
+            Property.objects.values_list('title', flat=True), ['Complete']
+        )
+
+    def test_invalid_row_is_reported_and_skipped(self, clear_cache):
+        result = self.import_rows([make_row(bedrooms='-1')])
+
+        self.assertFalse(result['success'])
+        self.assertEqual(result['errors'], ['Row 2: bedrooms: Bedrooms cannot be negative'])
+        self.assertFalse(Property.objects.exists())
+
+    def test_imported_count_only_counts_new_titles(self, clear_cache):
+        make_property(title='Existing')
+
+        result = self.import_rows([
+            make_row(title='Existing'),
+            make_row(title='New One'),
+            make_row(title='New Two'),
+        ])
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['imported_count'], 2)
+        self.assertEqual(Property.objects.count(), 3)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class GetPropertiesByFiltersTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cabin = make_property(
+            title='Mountain Cabin', description='Quiet log cabin near the ski slopes',
+            price_per_night=Decimal('80.00'), bedrooms=1, guests=2,
+            country='Switzerland', country_code='CH', category='cottage',
+        )
+        cls.villa = make_property(
+            title='Seaside Villa', description='Private pool overlooking the ocean',
+            price_per_night=Decimal('300.00'), bedrooms=4, guests=8,
+            country='Kenya', country_code='KE', category='villa', favorited=True,
+        )
+        cls.flat = make_property(
+            title='City Apartment', description='Walk to museums and cafes',
+            price_per_night=Decimal('120.00'), bedrooms=2, guests=4,
+            country='Kenya', country_code='KE', category='apartment',
+        )
+
+    def assertFilterMatches(self, filters, expected):
+        self.assertQuerySetEqual(
+            get_properties_by_filters(filters), expected, ordered=False
+        )
+
+    def test_no_filters_returns_everything(self):
+        self.assertFilterMatches({}, [self.cabin, self.villa, self.flat])
+
+    def test_category(self):
+        self.assertFilterMatches({'category': 'villa'}, [self.villa])
+
+    def test_price_range(self):
+        self.assertFilterMatches(
+            {'min_price': Decimal('100'), 'max_price': Decimal('200')}, [self.flat]
+        )
+
+    def test_minimum_bedrooms(self):
+        self.assertFilterMatches({'bedrooms': 2}, [self.villa, self.flat])
+
+    def test_falsy_values_are_ignored(self):
+        self.assertFilterMatches(
+            {'category': '', 'bedrooms': 0, 'country': None},
+            [self.cabin, self.villa, self.flat],
+        )
+
+    def test_favorited_false_is_applied(self):
+        self.assertFilterMatches({'favorited': False}, [self.cabin, self.flat])
+
+    def test_country_is_case_insensitive_substring(self):
+        self.assertFilterMatches({'country': 'ken'}, [self.villa, self.flat])
+
+    def test_combined_filters(self):
+        self.assertFilterMatches(
+            {'country': 'Kenya', 'max_price': Decimal('150')}, [self.flat]
+        )
+
+    def test_search_matches_description(self):
+        self.assertFilterMatches({'search': 'pool'}, [self.villa])
+
+    def test_description_is_deferred(self):
+        result = get_properties_by_filters({'category': 'cottage'}).get()
+        self.assertIn('description', result.get_deferred_fields())
+
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AllPropertiesCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_write_invalidates_only_its_shard(self):
+        first = make_property(title='First')
+        make_property(title='Second')
+        get_all_properties()
+        self.assertEqual(len(cache.get_many(ALL_PROPERTIES_SHARD_KEYS)), PROPERTY_SHARD_COUNT)
+
+        update_property_favorite_status(first.id, True)
+
+        cached = cache.get_many(ALL_PROPERTIES_SHARD_KEYS)
+        self.assertEqual(
+            set(ALL_PROPERTIES_SHARD_KEYS) - set(cached),
+            {_property_shard_key(first.id % PROPERTY_SHARD_COUNT)},
+        )
+        favorited = {row['title']: row['favorited'] for row in get_all_properties()}
+        self.assertEqual(favorited, {'First': True, 'Second': False})
+
+    def test_refill_in_progress_serves_stale_list(self):
+        make_property(title='Fresh')
+        stale = [{'id': 0, 'title': 'Stale'}]
+        cache.set(ALL_PROPERTIES_STALE_KEY, orjson.dumps(stale))
+        cache.add(ALL_PROPERTIES_LOCK_KEY, '1')
+
+        self.assertEqual(get_all_properties(), stale)
+        # The lock holder refills the shards, not this caller
+        self.assertEqual(cache.get_many(ALL_PROPERTIES_SHARD_KEYS), {})
+
+    def test_cold_cache_waits_for_refilling_worker(self):
+        make_property(title='Refilled')
+        shards = _build_property_shards(range(PROPERTY_SHARD_COUNT))
+        cache.add(ALL_PROPERTIES_LOCK_KEY, '1')
+
+        # The other worker finishes its refill during the first poll
+        with mock.patch(
+            'properties.utils.time.sleep', side_effect=lambda _: cache.set_many(shards)
+        ), self.assertNumQueries(0):
+            properties = get_all_properties()
+
+        self.assertEqual([row['title'] for row in properties], ['Refilled'])
+
+    def test_cold_cache_builds_after_wait_timeout(self):
+        make_property(title='Built')
+        cache.add(ALL_PROPERTIES_LOCK_KEY, '1')
+
+        with mock.patch('properties.utils.ALL_PROPERTIES_WAIT_TIMEOUT', 0):
+            properties = get_all_properties()
+
+        self.assertEqual([row['title'] for row in properties], ['Built'])
+        self.assertEqual(len(cache.get_many(ALL_PROPERTIES_SHARD_KEYS)), PROPERTY_SHARD_COUNT)
+        # The other worker's lock is left alone
+        self.assertFalse(cache.add(ALL_PROPERTIES_LOCK_KEY, '1'))
+
+
+def read_body(response):
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PropertyListViewTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('property_list')
+
+    def test_refill_in_progress_never_serves_stale_shard_copy(self):
+        make_property(title='Fresh')
+        # The stale shard copy predates the write, and other workers hold
+        # both the shard and the list body refill locks
+        cache.set(ALL_PROPERTIES_STALE_KEY, orjson.dumps([]))
+        cache.add(ALL_PROPERTIES_LOCK_KEY, '1')
+        generation = get_property_list_generation()
+        acquire_property_list_refill_lock(generation)
+
+        with mock.patch('properties.utils.PROPERTY_LIST_WAIT_TIMEOUT', 0):
+            response = self.client.get(self.url)
+            data = orjson.loads(read_body(response))['data']
+
+        self.assertEqual([row['title'] for row in data], ['Fresh'])
+        # Only the lock holder caches the body
+        self.assertIsNone(get_cached_property_list_body(generation))
+
+    def test_closing_unstarted_stream_releases_refill_lock(self):
+        self.assertTrue(acquire_property_list_refill_lock(0))
+
+        PropertyListBodyStream(0).close()
+
+        self.assertTrue(acquire_property_list_refill_lock(0))
+
+    def test_matching_etag_gets_not_modified(self):
+        make_property()
+        first = self.client.get(self.url)
+        read_body(first)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_write_changes_etag(self):
+        prop = make_property()
+        first = self.client.get(self.url)
+        read_body(first)
+
+        update_property_favorite_status(prop.id, True)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertTrue(orjson.loads(read_body(response))['data'][0]['favorited'])
+
+    def test_streamed_body_matches_cached_body(self):
+        make_property(title='One')
+        make_property(title='Two')
+
+        streamed = read_body(self.client.get(self.url))
+        cached = get_cached_property_list_body(get_property_list_generation())
+
+        self.assertEqual(gzip.decompress(cached), streamed)
+        gzipped = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(gzipped['Content-Encoding'], 'gzip')
+        self.assertEqual(gzipped.content, cached)
+        self.assertEqual(self.client.get(self.url).content, streamed)
+
+    def test_body_streamed_across_a_clear_is_not_cached(self):
+        make_property()
+        generation = get_property_list_generation()
+        chunks = stream_property_list_body(generation)
+        next(chunks)
+
+        clear_properties_cache()
+        list(chunks)
+
+        self.assertIsNone(get_cached_property_list_body(generation))
+        self.assertIsNone(get_cached_property_list_body(get_property_list_generation()))
+
+    def test_clear_deletes_retired_generation(self):
+        make_property()
+        read_body(self.client.get(self.url))
+        generation = get_property_list_generation()
+        self.assertIsNotNone(get_cached_property_list_body(generation))
+
+        clear_properties_cache()
+
+        self.assertIsNone(get_cached_property_list_body(generation))
+
+
+class MonitorCachePerformanceTests(SimpleTestCase):
+
+    @mock.patch('properties.utils.cache')
+    def test_redis_down_returns_error_metrics(self, mocked_cache):
+        mocked_cache.get.side_effect = ConnectionInterrupted(connection=None)
+        mocked_cache.add.side_effect = ConnectionInterrupted(connection=None)
+
+        with self.assertLogs('properties.utils', level='WARNING'):
+            metrics = monitor_cache_performance()
+
+        self.assertEqual(metrics['error'], 'Redis connection failed')
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CountryCodeCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    @mock.patch('properties.utils._fetch_country_code', return_value='KE')
+    def test_code_is_cached(self, fetch):
+        self.assertEqual(get_country_code('Kenya'), 'KE')
+        self.assertEqual(get_country_code('kenya'), 'KE')
+        fetch.assert_called_once()
+
+    @mock.patch('properties.utils._fetch_country_code', return_value='')
+    def test_unknown_country_is_negatively_cached(self, fetch):
+        self.assertIsNone(get_country_code('Atlantis'))
+        self.assertIsNone(get_country_code('Atlantis'))
+        fetch.assert_called_once()
+
+    @mock.patch('properties.utils._fetch_country_code', return_value=None)
+    def test_failed_lookup_is_not_cached(self, fetch):
+        self.assertIsNone(get_country_code('Kenya'))
+        self.assertIsNone(get_country_code('Kenya'))
+        self.assertEqual(fetch.call_count, 2)
+
+    @mock.patch('properties.utils._COUNTRY_CODE_REFRESHER')
+    @mock.patch('properties.utils._fetch_country_code')
+    def test_stale_code_is_served_and_refreshed_once(self, fetch, refresher):
+        fetched_at = time.time() - COUNTRY_CODE_SOFT_TIMEOUT - 1
+        cache.set(_country_code_cache_key('Kenya'), {'code': 'KE', 'fetched_at': fetched_at})
+
+        self.assertEqual(get_country_code('Kenya'), 'KE')
+        self.assertEqual(get_country_code('Kenya'), 'KE')
+
+        fetch.assert_not_called()
+        refresher.submit.assert_called_once_with(_refresh_country_code, 'Kenya')
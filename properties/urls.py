@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import property_list
+from .views import property_export_csv, property_list
 
 urlpatterns = [
     path("", property_list, name="property_list"),
+    path("export/", property_export_csv, name="property_export_csv"),
 ]
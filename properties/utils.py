@@ -1,26 +1,149 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from django.conf import settings
+from django.contrib.postgres.search import SearchQuery
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Avg, CharField, Count, F, Func, Max, Q, Value
 from django.utils import timezone
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
+from operator import itemgetter
+from decimal import Decimal
+import hashlib
 import logging
+import orjson
+import threading
+import time
+import zlib
 import redis
-from .models import Property
+from django_redis import get_redis_connection
+from django_redis.exceptions import ConnectionInterrupted
+from .models import PROPERTY_SEARCH_CONFIG, PROPERTY_SEARCH_VECTOR, Property
 
 logger = logging.getLogger(__name__)
 
+# Built once at import instead of on every validation call
+_CATEGORY_LABELS = dict(Property.PROPERTY_CATEGORIES)
+_VALID_CATEGORIES = frozenset(_CATEGORY_LABELS)
+NUMERIC_FIELDS = ('bedrooms', 'bathrooms', 'guests')
+REQUIRED_IMPORT_FIELDS = ('title', 'price_per_night', 'bedrooms', 'bathrooms', 'guests', 'country')
+
+# Per-thread memo in front of Redis, only used while a request is being
+# handled; ClearRequestCacheMiddleware activates it and resets it per request
+_request_cache = threading.local()
+
+def activate_request_cache():
+    _request_cache.__dict__.clear()
+    _request_cache.active = True
+
+def clear_request_cache():
+    _request_cache.__dict__.clear()
+
+def _request_cache_get(name):
+    if getattr(_request_cache, 'active', False):
+        return getattr(_request_cache, name, None)
+    return None
+
+def _request_cache_set(name, value):
+    if getattr(_request_cache, 'active', False):
+        setattr(_request_cache, name, value)
+
+# Property-derived keys are cleared by the post_save/post_delete signals and
+# by the bulk write paths, so their TTL is only a safety net. It stays short
+# enough to bound how long a value written by a refill that raced a clear
+# (read before the write, stored after it) can be served
+PROPERTIES_CACHE_TIMEOUT = 60 * 60 * 24  # 1 day
+
+# The all-properties list is cached in shards keyed by id % PROPERTY_SHARD_COUNT
+# so a single write only invalidates (and refills) one shard
+PROPERTY_SHARD_COUNT = 8
+
+def _property_shard_key(index):
+    return f'all_properties:shard:{index}'
+
+ALL_PROPERTIES_SHARD_KEYS = tuple(
+    _property_shard_key(index) for index in range(PROPERTY_SHARD_COUNT)
+)
+
+# Single-flight refill: one worker rebuilds missing shards while the others
+# serve the last full list, which outlives invalidation on purpose
+ALL_PROPERTIES_LOCK_KEY = 'all_properties:lock'
+ALL_PROPERTIES_STALE_KEY = 'all_properties:stale'
+
+HOMEPAGE_RECENT_CACHE_KEY = 'homepage:recent'
+HOMEPAGE_POPULAR_CACHE_KEY = 'homepage:popular'
+PROPERTY_STATS_CACHE_KEY = 'property_stats'
+# Incremented by every clear; the cached list body and ETag are stored per
+# generation so neither, if built from rows read before a write, is served after it
+PROPERTY_LIST_GENERATION_KEY = 'property_list:generation'
+PROPERTY_LIST_REFILL_LOCK_TIMEOUT = 60  # seconds
+
+def _property_list_body_cache_key(generation):
+    # Bump the version whenever the shape of the list response changes
+    return f'property_list:v2:body:{generation}'
+
+def _property_list_etag_cache_key(generation):
+    return f'property_list:etag:{generation}'
+
+def _property_list_refill_lock_key(generation):
+    return f'property_list:refill_lock:{generation}'
+
+def _cache_for_generation(cache_key, value, generation):
+    """
+    Cache a value built from rows read under the given list generation
+    If a clear bumped the generation in the meantime the value is deleted
+    again: nothing reads that generation any more, and the clear itself
+    only deletes the generation it retired
+    """
+    cache.set(cache_key, value, PROPERTIES_CACHE_TIMEOUT)
+    if cache.get(PROPERTY_LIST_GENERATION_KEY, 0) != generation:
+        cache.delete(cache_key)
+
+# Cache keys holding derived property data; invalidated together
+PROPERTIES_CACHE_KEYS = ALL_PROPERTIES_SHARD_KEYS + (
+    HOMEPAGE_RECENT_CACHE_KEY,
+    HOMEPAGE_POPULAR_CACHE_KEY,
+    PROPERTY_STATS_CACHE_KEY,
+)
+
+REDIS_METRICS_CACHE_KEY = '_redis_metrics'
+REDIS_METRICS_CACHE_TIMEOUT = 10  # seconds
+MONITOR_LOCK_KEY = '_monitor_lock'
+MONITOR_LOCK_TIMEOUT = 60  # seconds
+
 def get_redis_cache_metrics():
     """
     Retrieve Redis cache metrics including keyspace hits, misses, and calculate hit ratio
     Returns a dictionary with cache performance metrics
+    Only the INFO sections that are read (stats, memory, clients) are
+    requested, together with maxmemory, in one pipelined round trip
+    Successful results are cached for a few seconds so bursts of calls
+    share one INFO round
     """
     try:
-        # Get Redis connection from cache
-        redis_client = cache._client
+        cached_metrics = cache.get(REDIS_METRICS_CACHE_KEY)
+        if cached_metrics is not None:
+            return cached_metrics
+        
+        # Get the raw Redis connection behind the default cache
+        redis_client = get_redis_connection('default')
         
-        # Get Redis info command output
-        info = redis_client.info()
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.info(section='stats')
+        pipe.info(section='memory')
+        pipe.info(section='clients')
+        pipe.config_get('maxmemory')
+        stats_info, memory_info, clients_info, max_memory_config = pipe.execute(
+            raise_on_error=False
+        )
+        for section in (stats_info, memory_info, clients_info):
+            if isinstance(section, Exception):
+                raise section
+        
+        info = {**stats_info, **memory_info, **clients_info}
         
         # Extract keyspace hits and misses
         keyspace_hits = info.get('keyspace_hits', 0)
@@ -37,6 +160,14 @@ def get_redis_cache_metrics():
         expired_keys = info.get('expired_keys', 0)
         connected_clients = info.get('connected_clients', 0)
         
+        # CONFIG can be disabled on managed Redis; 0 means no limit
+        max_memory = 0
+        if isinstance(max_memory_config, dict):
+            max_memory = int(max_memory_config.get('maxmemory', 0) or 0)
+        memory_usage_percentage = (
+            round(used_memory / max_memory * 100, 2) if max_memory > 0 else None
+        )
+        
         metrics = {
             'keyspace_hits': keyspace_hits,
             'keyspace_misses': keyspace_misses,
@@ -45,6 +176,8 @@ def get_redis_cache_metrics():
             'hit_ratio_percentage': round(hit_ratio * 100, 2),  # As percentage
             'used_memory': used_memory,
             'used_memory_human': used_memory_human,
+            'max_memory': max_memory,
+            'memory_usage_percentage': memory_usage_percentage,
             'evicted_keys': evicted_keys,
             'expired_keys': expired_keys,
             'connected_clients': connected_clients,
@@ -60,9 +193,11 @@ def get_redis_cache_metrics():
             f"Expired: {expired_keys}, Clients: {connected_clients}"
         )
         
+        cache.set(REDIS_METRICS_CACHE_KEY, metrics, REDIS_METRICS_CACHE_TIMEOUT)
+        
         return metrics
         
-    except redis.ConnectionError as e:
+    except (redis.ConnectionError, ConnectionInterrupted) as e:
         logger.error(f"Redis connection error: {e}")
         return {
             'error': 'Redis connection failed',
@@ -85,147 +220,570 @@ def get_redis_cache_metrics():
             'timestamp': timezone.now().isoformat()
         }
 
+# Columns used by list endpoints; the description TEXT column is left out
+# and only loaded by get_property_detail
+PROPERTY_LIST_FIELDS = (
+    'id', 'title', 'price_per_night', 'bedrooms', 'bathrooms', 'guests',
+    'country', 'country_code', 'category', 'favorited', 'created_at'
+)
+
+PROPERTY_DETAIL_FIELDS = PROPERTY_LIST_FIELDS + ('description', 'updated_at')
+
+def _json_default(obj):
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _dump(rows):
+    """
+    Serialize property rows to JSON bytes with orjson
+    Decimals become strings, datetimes ISO 8601 strings
+    """
+    return orjson.dumps(rows, default=_json_default, option=orjson.OPT_NAIVE_UTC)
+
+def _load(payload):
+    return orjson.loads(payload)
+
+def _select_shard_rows_sql():
+    """
+    SQL selecting the list columns for the rows in a set of shards
+    Built from the model metadata so it follows table and column names
+    """
+    quote = connection.ops.quote_name
+    opts = Property._meta
+    columns = ', '.join(quote(opts.get_field(name).column) for name in PROPERTY_LIST_FIELDS)
+    pk_column = quote(opts.pk.column)
+    return (
+        f"SELECT {columns} FROM {quote(opts.db_table)} "
+        f"WHERE {pk_column} %% %s = ANY(%s)"
+    )
+
+def _build_property_shards(shard_indexes):
+    """
+    Query the rows belonging to the given shards and encode one payload per shard
+    Returns a dict mapping shard cache key to encoded rows
+    Uses a raw cursor: this read-only cache fill doesn't need the ORM's
+    queryset and per-row machinery
+    """
+    shards = {index: [] for index in shard_indexes}
+    with connection.cursor() as cursor:
+        cursor.execute(_select_shard_rows_sql(), [PROPERTY_SHARD_COUNT, list(shard_indexes)])
+        while True:
+            chunk = cursor.fetchmany(2000)
+            if not chunk:
+                break
+            for values in chunk:
+                row = dict(zip(PROPERTY_LIST_FIELDS, values))
+                shards[row['id'] % PROPERTY_SHARD_COUNT].append(row)
+    return {_property_shard_key(index): _dump(shard) for index, shard in shards.items()}
+
+ALL_PROPERTIES_WAIT_TIMEOUT = 2  # seconds
+ALL_PROPERTIES_WAIT_INTERVAL = 0.05  # seconds
+
+def _wait_for_property_shards(shard_indexes):
+    """
+    Poll the cache while another worker refills the given shards
+    Returns the refilled payloads, or None if they don't all appear in time
+    """
+    keys = [_property_shard_key(index) for index in shard_indexes]
+    deadline = time.monotonic() + ALL_PROPERTIES_WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(ALL_PROPERTIES_WAIT_INTERVAL)
+        payloads = cache.get_many(keys)
+        if len(payloads) == len(keys):
+            return payloads
+    return None
+
 def get_all_properties():
     """
     Get all properties with caching mechanism
-    Cache results for 1 hour (3600 seconds) to improve performance
+    Results stay cached until a property write invalidates them
+    Rows are cached as orjson-encoded bytes split across shards; all shards
+    are read with one get_many (MGET) and only missing shards are rebuilt
+    While another worker holds the refill lock the last full list is
+    returned, or on a cold cache the refilled shards are awaited
+    Repeated calls within one request reuse the first result
     """
-    cached_properties = cache.get('all_properties')
+    properties = _request_cache_get('all_properties')
+    if properties is not None:
+        return properties
+    
+    payloads = cache.get_many(ALL_PROPERTIES_SHARD_KEYS)
     
-    if cached_properties is not None:
+    missing = [
+        index for index, key in enumerate(ALL_PROPERTIES_SHARD_KEYS)
+        if key not in payloads
+    ]
+    if missing:
+        has_lock = cache.add(ALL_PROPERTIES_LOCK_KEY, '1', 10)
+        if not has_lock:
+            stale_payload = cache.get(ALL_PROPERTIES_STALE_KEY)
+            if stale_payload is not None:
+                logger.debug("Properties refill in progress, returning stale properties")
+                properties = _load(stale_payload)
+                _request_cache_set('all_properties', properties)
+                return properties
+            # Nothing stale to serve (cold cache): wait briefly for the
+            # lock holder before falling back to the database
+            refilled = _wait_for_property_shards(missing)
+            if refilled is not None:
+                payloads.update(refilled)
+                missing = []
+        
+        if missing:
+            try:
+                logger.debug(f"Fetching property shards {missing} from database")
+                fresh = _build_property_shards(missing)
+                cache.set_many(fresh, PROPERTIES_CACHE_TIMEOUT)
+                payloads.update(fresh)
+            finally:
+                if has_lock:
+                    cache.delete(ALL_PROPERTIES_LOCK_KEY)
+    else:
         logger.debug("Returning cached properties")
-        return cached_properties
     
-    logger.debug("Fetching properties from database")
-    properties = Property.objects.all().order_by('-created_at')
+    properties = [row for payload in payloads.values() for row in _load(payload)]
+    # created_at is an ISO 8601 UTC string here, so it sorts chronologically
+    properties.sort(key=itemgetter('created_at', 'id'), reverse=True)
+    if missing:
+        # Only reached by the worker that rebuilt shards
+        cache.set(ALL_PROPERTIES_STALE_KEY, _dump(properties), PROPERTIES_CACHE_TIMEOUT * 2)
+    _request_cache_set('all_properties', properties)
+    return properties
+
+STREAM_BATCH_ROWS = 500
+
+def get_property_list_generation():
+    """
+    Get the current property list generation (0 until the first clear)
+    Read it before reading any rows, and cache what those rows produce
+    under it; repeated calls within one request reuse the first value
+    """
+    generation = _request_cache_get('property_list_generation')
+    if generation is None:
+        generation = cache.get(PROPERTY_LIST_GENERATION_KEY, 0)
+        _request_cache_set('property_list_generation', generation)
+    return generation
+
+def get_cached_property_list_body(generation):
+    """
+    Get the gzip-compressed JSON body of the property list response for
+    the given generation, or None if it isn't cached
+    A hit skips building and encoding the rows entirely; the repetitive
+    JSON compresses well, cutting Redis memory and transfer
+    """
+    return cache.get(_property_list_body_cache_key(generation))
+
+def acquire_property_list_refill_lock(generation):
+    """
+    Try to become the one worker that streams and caches the list body for
+    the given generation; the lock is released by PropertyListBodyStream
+    """
+    return cache.add(
+        _property_list_refill_lock_key(generation), '1', PROPERTY_LIST_REFILL_LOCK_TIMEOUT
+    )
+
+PROPERTY_LIST_WAIT_TIMEOUT = 2  # seconds
+PROPERTY_LIST_WAIT_INTERVAL = 0.05  # seconds
+
+def wait_for_property_list_body(generation):
+    """
+    Poll the cache while another worker streams the list body for the
+    given generation
+    Returns the body, or None if it doesn't appear in time or the refill
+    lock is released without it being cached
+    """
+    body_key = _property_list_body_cache_key(generation)
+    lock_key = _property_list_refill_lock_key(generation)
+    deadline = time.monotonic() + PROPERTY_LIST_WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(PROPERTY_LIST_WAIT_INTERVAL)
+        found = cache.get_many([body_key, lock_key])
+        if body_key in found:
+            return found[body_key]
+        if lock_key not in found:
+            break
+    return None
+
+def stream_property_list_body(generation, cache_body=True):
+    """
+    Yield the property list JSON body straight from the database
+    Rows are read in chunks and encoded in batches, so memory stays flat
+    however large the table is
+    With cache_body the output is also gzip-compressed on the side and
+    cached under the generation read before the rows, once the last row
+    has been sent; only the refill lock holder should do that, through
+    PropertyListBodyStream
+    """
+    compressor = zlib.compressobj(wbits=31) if cache_body else None  # 31 = gzip container
+    compressed = []
     
-    # Cache the queryset for 1 hour
-    cache.set('all_properties', properties, 3600)
+    def emit(chunk):
+        if compressor is not None:
+            compressed.append(compressor.compress(chunk))
+        return chunk
     
-    return properties
+    yield emit(b'{"data":[')
+    
+    rows = Property.objects.order_by('-created_at', '-id').values(
+        *PROPERTY_LIST_FIELDS
+    ).iterator(chunk_size=2000)
+    batch = []
+    first = True
+    for row in rows:
+        batch.append(_dump(row))
+        if len(batch) >= STREAM_BATCH_ROWS:
+            yield emit((b'' if first else b',') + b','.join(batch))
+            batch = []
+            first = False
+    if batch:
+        yield emit((b'' if first else b',') + b','.join(batch))
+    
+    yield emit(b']}')
+    
+    # Only reached when the whole body was sent
+    if compressor is not None:
+        compressed.append(compressor.flush())
+        _cache_for_generation(
+            _property_list_body_cache_key(generation), b''.join(compressed), generation
+        )
 
-def get_country_code(country_name):
+class PropertyListBodyStream:
     """
-    Get country code from country name using REST Countries API
+    Streaming response content for the holder of a generation's refill lock
+    Streams and caches the list body, and releases the lock in close(),
+    which the server calls for every response; a generator's finally block
+    doesn't run if it is closed before the first chunk (HEAD requests,
+    clients that disconnect early)
     """
-    cache_key = f'country_code_{country_name.lower()}'
-    cached_code = cache.get(cache_key)
+    def __init__(self, generation):
+        self.generation = generation
+        self._chunks = stream_property_list_body(generation)
     
-    if cached_code:
-        return cached_code
+    def __iter__(self):
+        return self._chunks
     
+    def close(self):
+        try:
+            self._chunks.close()
+        finally:
+            cache.delete(_property_list_refill_lock_key(self.generation))
+
+def get_property_list_etag():
+    """
+    Get the ETag for the property list response
+    Derived from the list generation, row count and latest updated_at, so
+    any insert, update or delete changes it; cached per generation, so a
+    value computed from rows read before a clear is never served after it
+    Repeated calls within one request reuse the first value
+    """
+    etag = _request_cache_get('property_list_etag')
+    if etag is not None:
+        return etag
+    
+    generation = get_property_list_generation()
+    cache_key = _property_list_etag_cache_key(generation)
+    etag = cache.get(cache_key)
+    
+    if etag is None:
+        summary = Property.objects.aggregate(
+            count=Count('id'), last_modified=Max('updated_at')
+        )
+        last_modified = summary['last_modified']
+        fingerprint = (
+            f"{generation}:{summary['count']}:"
+            f"{last_modified.isoformat() if last_modified else ''}"
+        )
+        # Weak: the same data is served gzip-encoded or not
+        etag = f'W/"{hashlib.md5(fingerprint.encode()).hexdigest()}"'
+        _cache_for_generation(cache_key, etag, generation)
+    
+    _request_cache_set('property_list_etag', etag)
+    return etag
+
+def _property_detail_cache_key(property_id):
+    return f'prop:detail:{property_id}'
+
+def get_property_detail(property_id):
+    """
+    Get a single property including its description, cached by id
+    """
+    cache_key = _property_detail_cache_key(property_id)
+    payload = cache.get(cache_key)
+    
+    if payload is None:
+        row = Property.objects.filter(pk=property_id).values(*PROPERTY_DETAIL_FIELDS).first()
+        if row is None:
+            raise ValueError("Property does not exist")
+        payload = _dump(row)
+        cache.set(cache_key, payload, PROPERTIES_CACHE_TIMEOUT)
+    
+    return _load(payload)
+
+COUNTRY_CODE_CACHE_TIMEOUT = 60 * 60 * 24  # 24 hours, hard expiry
+COUNTRY_CODE_SOFT_TIMEOUT = 60 * 60  # refreshed in the background after 1 hour
+COUNTRY_CODE_NOT_FOUND_TIMEOUT = 60 * 60  # unknown countries are retried after 1 hour
+COUNTRY_CODE_FETCH_WORKERS = 10
+
+# Shared HTTP session: keeps TLS connections to the API alive between lookups
+# and retries transient server errors with backoff
+_COUNTRY_API_SESSION = requests.Session()
+_COUNTRY_API_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=COUNTRY_CODE_FETCH_WORKERS,
+    pool_maxsize=COUNTRY_CODE_FETCH_WORKERS * 2,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504)),
+))
+
+# Runs stale-while-revalidate refreshes off the request path
+_COUNTRY_CODE_REFRESHER = ThreadPoolExecutor(max_workers=2)
+
+def _country_code_cache_key(country_name):
+    return f'country_code:v2:{country_name.lower()}'
+
+def _fetch_country_code(country_name, session=None):
+    """
+    Look up a country code from the REST Countries API (no caching)
+    Returns the code, '' if the API does not know the country, or None if
+    the lookup failed
+    """
+    http = session or _COUNTRY_API_SESSION
     try:
-        response = requests.get(
+        response = http.get(
             f'https://restcountries.com/v3.1/name/{country_name}',
             timeout=5
         )
+        if response.status_code == 404:
+            return ''
         response.raise_for_status()
         
         data = response.json()
         if data and isinstance(data, list):
-            country_code = data[0].get('cca2', '').upper()
-            # Cache for 24 hours
-            cache.set(cache_key, country_code, 60 * 60 * 24)
-            return country_code
+            return data[0].get('cca2', '').upper()
+        return ''
             
     except requests.RequestException as e:
         logger.warning(f"Failed to fetch country code for {country_name}: {e}")
     
     return None
 
-def validate_property_data(data):
+def _store_country_codes(codes):
     """
-    Validate property data before saving
+    Cache fetched codes ({cache_key: code}) with their fetch time
+    Unknown countries ('') are cached for a shorter time
     """
-    errors = {}
+    fetched_at = time.time()
+    found = {}
+    not_found = {}
+    for cache_key, code in codes.items():
+        entry = {'code': code, 'fetched_at': fetched_at}
+        if code:
+            found[cache_key] = entry
+        else:
+            not_found[cache_key] = entry
     
-    # Validate price
-    if 'price_per_night' in data and data['price_per_night'] <= 0:
-        errors['price_per_night'] = 'Price must be greater than 0'
+    if found:
+        cache.set_many(found, COUNTRY_CODE_CACHE_TIMEOUT)
+    if not_found:
+        cache.set_many(not_found, COUNTRY_CODE_NOT_FOUND_TIMEOUT)
+
+def _refresh_country_code(country_name):
+    code = _fetch_country_code(country_name)
+    if code is not None:
+        _store_country_codes({_country_code_cache_key(country_name): code})
+
+def _read_country_code_entry(country_name, entry):
+    """
+    Return the code held by a cache entry, scheduling a background refresh
+    once the entry is past its soft expiry
+    """
+    if entry['code'] and time.time() - entry['fetched_at'] > COUNTRY_CODE_SOFT_TIMEOUT:
+        refresh_key = f'{_country_code_cache_key(country_name)}:refreshing'
+        if cache.add(refresh_key, '1', 60):
+            _COUNTRY_CODE_REFRESHER.submit(_refresh_country_code, country_name)
+    return entry['code'] or None
+
+def get_country_code(country_name, session=None):
+    """
+    Get country code from country name using REST Countries API
+    Stale codes are returned immediately and refreshed in the background
+    Repeated lookups within one request reuse the first result
+    """
+    cache_key = _country_code_cache_key(country_name)
+    request_codes = _request_cache_get('country_codes')
+    if request_codes and cache_key in request_codes:
+        return request_codes[cache_key]
     
-    # Validate numeric fields
-    numeric_fields = ['bedrooms', 'bathrooms', 'guests']
-    for field in numeric_fields:
-        if field in data and data[field] < 0:
-            errors[field] = f'{field.capitalize()} cannot be negative'
+    entry = cache.get(cache_key)
     
-    # Validate category
-    if 'category' in data:
-        valid_categories = dict(Property.PROPERTY_CATEGORIES).keys()
-        if data['category'] not in valid_categories:
-            errors['category'] = f'Invalid category. Must be one of: {", ".join(valid_categories)}'
+    if entry is not None:
+        country_code = _read_country_code_entry(country_name, entry)
+    else:
+        fetched = _fetch_country_code(country_name, session=session)
+        if fetched is not None:
+            _store_country_codes({cache_key: fetched})
+        country_code = fetched or None
+    
+    if country_code:
+        if request_codes is None:
+            request_codes = {}
+            _request_cache_set('country_codes', request_codes)
+        request_codes[cache_key] = country_code
+    
+    return country_code
+
+def get_country_codes(country_names):
+    """
+    Resolve many country names at once
+    Cached codes are read with a single get_many (MGET), misses are fetched
+    concurrently over the shared HTTP session and written back with a
+    single set_many
+    Returns a dict mapping each country name to its code (or None)
+    """
+    keys = {name: _country_code_cache_key(name) for name in set(country_names)}
+    cached = cache.get_many(list(keys.values()))
+    
+    codes = {}
+    missing = []
+    for name, key in keys.items():
+        if key in cached:
+            codes[name] = _read_country_code_entry(name, cached[key])
+        else:
+            missing.append(name)
+    
+    if missing:
+        new_codes = {}
+        with ThreadPoolExecutor(max_workers=COUNTRY_CODE_FETCH_WORKERS) as executor:
+            fetched = executor.map(_fetch_country_code, missing)
+            for name, country_code in zip(missing, fetched):
+                codes[name] = country_code or None
+                if country_code is not None:
+                    new_codes[keys[name]] = country_code
+        
+        if new_codes:
+            _store_country_codes(new_codes)
+    
+    return codes
+
+_ZERO = Decimal('0')
+_SENTINEL = object()
+
+# Validation schema compiled once at import: (field, is_invalid, message)
+# Messages are pre-rendered so failing rows don't format strings
+_PROPERTY_RULES = (
+    ('price_per_night', lambda value: value <= _ZERO, 'Price must be greater than 0'),
+) + tuple(
+    (field, lambda value: value < 0, f'{field.capitalize()} cannot be negative')
+    for field in NUMERIC_FIELDS
+) + (
+    ('category', lambda value: value not in _VALID_CATEGORIES,
+     f'Invalid category. Must be one of: {", ".join(_CATEGORY_LABELS)}'),
+)
+
+def validate_property_data(data):
+    """
+    Validate property data before saving
+    Runs the precompiled _PROPERTY_RULES; each field is looked up once and
+    fields missing from data are skipped
+    """
+    get = data.get
+    errors = {
+        field: message
+        for field, is_invalid, message in _PROPERTY_RULES
+        if (value := get(field, _SENTINEL)) is not _SENTINEL and is_invalid(value)
+    }
     
     if errors:
         raise ValidationError(errors)
     
     return True
 
+def _property_price_cache_key(property_id):
+    return f'prop:price:{property_id}'
+
+def _get_price(property_id):
+    """
+    Get the nightly price of a property, cached per id
+    Reads only the price column instead of hydrating the whole row
+    Returns None if the property does not exist
+    """
+    cache_key = _property_price_cache_key(property_id)
+    price = cache.get(cache_key)
+    
+    if price is None:
+        price = Property.objects.filter(pk=property_id).values_list(
+            'price_per_night', flat=True
+        ).first()
+        if price is not None:
+            cache.set(cache_key, price, PROPERTIES_CACHE_TIMEOUT)
+    
+    return price
+
 def calculate_total_price(property_id, check_in_date, check_out_date):
     """
     Calculate total price for a booking period
     """
     try:
-        property = Property.objects.get(id=property_id)
+        price_per_night = _get_price(property_id)
+    except Exception as e:
+        raise ValueError(f"Error calculating price: {str(e)}")
+    
+    if price_per_night is None:
+        raise ValueError("Property does not exist")
+    
+    try:
         nights = (check_out_date - check_in_date).days
         if nights <= 0:
             raise ValueError("Check-out date must be after check-in date")
         
-        total_price = property.price_per_night * nights
+        total_price = price_per_night * nights
         return total_price
         
-    except Property.DoesNotExist:
-        raise ValueError("Property does not exist")
     except Exception as e:
         raise ValueError(f"Error calculating price: {str(e)}")
 
+# Filters applied only when their value is truthy: filter key -> lookup
+_TRUTHY_FILTER_LOOKUPS = (
+    ('category', 'category'),
+    ('bedrooms', 'bedrooms__gte'),
+    ('bathrooms', 'bathrooms__gte'),
+    ('guests', 'guests__gte'),
+    ('country', 'country__icontains'),
+)
+
+# Filters applied whenever their value is not None: filter key -> lookup
+_NOT_NONE_FILTER_LOOKUPS = (
+    ('min_price', 'price_per_night__gte'),
+    ('max_price', 'price_per_night__lte'),
+    ('favorited', 'favorited'),
+)
+
 def get_properties_by_filters(filters):
     """
     Filter properties based on various criteria
+    All conditions are combined into one Q and applied with a single filter()
+    instead of cloning the queryset once per criterion
     """
     queryset = Property.objects.all()
+    conditions = Q()
     
-    # Category filter
-    if filters.get('category'):
-        queryset = queryset.filter(category=filters['category'])
-    
-    # Price range filter
-    min_price = filters.get('min_price')
-    max_price = filters.get('max_price')
-    if min_price is not None:
-        queryset = queryset.filter(price_per_night__gte=min_price)
-    if max_price is not None:
-        queryset = queryset.filter(price_per_night__lte=max_price)
-    
-    # Bedrooms filter
-    if filters.get('bedrooms'):
-        queryset = queryset.filter(bedrooms__gte=filters['bedrooms'])
-    
-    # Bathrooms filter
-    if filters.get('bathrooms'):
-        queryset = queryset.filter(bathrooms__gte=filters['bathrooms'])
-    
-    # Guests filter
-    if filters.get('guests'):
-        queryset = queryset.filter(guests__gte=filters['guests'])
-    
-    # Country filter
-    if filters.get('country'):
-        queryset = queryset.filter(country__icontains=filters['country'])
-    
-    # Favorited filter
-    if filters.get('favorited') is not None:
-        queryset = queryset.filter(favorited=filters['favorited'])
-    
-    # Search term filter
-    if filters.get('search'):
-        search_term = filters['search']
-        queryset = queryset.filter(
-            models.Q(title__icontains=search_term) |
-            models.Q(description__icontains=search_term) |
-            models.Q(country__icontains=search_term)
-        )
+    for key, lookup in _TRUTHY_FILTER_LOOKUPS:
+        value = filters.get(key)
+        if value:
+            conditions &= Q(**{lookup: value})
     
-    return queryset
+    for key, lookup in _NOT_NONE_FILTER_LOOKUPS:
+        value = filters.get(key)
+        if value is not None:
+            conditions &= Q(**{lookup: value})
+    
+    # Search term filter (full-text, served by the prop_search_idx GIN index)
+    search_term = filters.get('search')
+    if search_term:
+        queryset = queryset.alias(search=PROPERTY_SEARCH_VECTOR)
+        conditions &= Q(search=SearchQuery(search_term, config=PROPERTY_SEARCH_CONFIG))
+    
+    # Listings don't show the description, so don't transfer it
+    return queryset.filter(conditions).only(*PROPERTY_LIST_FIELDS)
 
 def get_recently_added_properties(limit=6):
     """
@@ -244,99 +802,264 @@ def get_popular_properties(limit=6):
         favorited=True
     ).order_by('-created_at')[:limit]
 
+def get_homepage_bundles(limit=6):
+    """
+    Get the recently added and popular properties for the homepage together
+    Both slices come from one UNION query and are cached with one set_many
+    (a single pipelined round trip)
+    Returns a dict with 'recent' and 'popular' lists of property dicts
+    """
+    cached = cache.get_many([HOMEPAGE_RECENT_CACHE_KEY, HOMEPAGE_POPULAR_CACHE_KEY])
+    if len(cached) == 2:
+        return {
+            'recent': _load(cached[HOMEPAGE_RECENT_CACHE_KEY]),
+            'popular': _load(cached[HOMEPAGE_POPULAR_CACHE_KEY]),
+        }
+    
+    one_week_ago = timezone.now() - timedelta(days=7)
+    recent = Property.objects.filter(
+        created_at__gte=one_week_ago
+    ).order_by('-created_at').values(*PROPERTY_LIST_FIELDS)[:limit]
+    popular = Property.objects.filter(
+        favorited=True
+    ).order_by('-created_at').values(*PROPERTY_LIST_FIELDS)[:limit]
+    rows = list(recent.union(popular).order_by('-created_at'))
+    
+    # A row can belong to both slices, so partition by predicate
+    payloads = {
+        HOMEPAGE_RECENT_CACHE_KEY: _dump(
+            [row for row in rows if row['created_at'] >= one_week_ago][:limit]
+        ),
+        HOMEPAGE_POPULAR_CACHE_KEY: _dump(
+            [row for row in rows if row['favorited']][:limit]
+        ),
+    }
+    # 'recent' also depends on the clock, so keep the hourly expiry here
+    cache.set_many(payloads, 3600)
+    
+    return {
+        'recent': _load(payloads[HOMEPAGE_RECENT_CACHE_KEY]),
+        'popular': _load(payloads[HOMEPAGE_POPULAR_CACHE_KEY]),
+    }
+
 def update_property_favorite_status(property_id, favorite):
     """
-    Update favorite status of a property and clear cache
+    Update favorite status of a property and clear its cached data
+    Issues a single UPDATE of the changed columns instead of loading the
+    row and saving every column back
+    Returns the property id
     """
-    try:
-        property = Property.objects.get(id=property_id)
-        property.favorited = favorite
-        property.save()
-        
-        # Clear the cache since properties data has changed
-        cache.delete('all_properties')
-        
-        return property
-    except Property.DoesNotExist:
+    updated = Property.objects.filter(id=property_id).update(
+        favorited=favorite,
+        updated_at=timezone.now(),  # auto_now isn't applied by update()
+    )
+    if updated == 0:
         raise ValueError("Property does not exist")
+    
+    # update() doesn't send post_save, so clear the cache here
+    clear_properties_cache(property_id=property_id)
+    
+    return property_id
 
-def clear_properties_cache():
+def clear_properties_cache(property_id=None):
     """
     Clear the properties cache
     Useful when properties are added, updated, or deleted
+    Pass property_id to only drop the list shard holding that property
+    (and its cached price and detail)
+    All keys are deleted with one delete_many (a single DEL command)
     """
-    cache.delete('all_properties')
+    keys = PROPERTIES_CACHE_KEYS
+    if property_id is not None:
+        shard_key = _property_shard_key(property_id % PROPERTY_SHARD_COUNT)
+        keys = [
+            shard_key,
+            _property_price_cache_key(property_id),
+            _property_detail_cache_key(property_id),
+        ] + [key for key in keys if key not in ALL_PROPERTIES_SHARD_KEYS]
+    elif hasattr(cache, 'delete_pattern'):
+        # Per-property keys can't be listed up front; backends without
+        # pattern deletes (e.g. locmem) leave them to PROPERTIES_CACHE_TIMEOUT
+        cache.delete_pattern('prop:*')
+    
+    # Retire the current list body and ETag, including ones still being
+    # built; add() creates the counter without expiry so incr() works on
+    # any backend
+    cache.add(PROPERTY_LIST_GENERATION_KEY, 0, None)
+    generation = cache.incr(PROPERTY_LIST_GENERATION_KEY)
+    cache.delete_many([
+        *keys,
+        _property_list_body_cache_key(generation - 1),
+        _property_list_etag_cache_key(generation - 1),
+    ])
+    # Later reads in this request must not see the old list
+    for name in ('all_properties', 'property_list_generation', 'property_list_etag'):
+        if hasattr(_request_cache, name):
+            delattr(_request_cache, name)
     logger.debug("Properties cache cleared")
 
 def get_property_statistics():
     """
     Get statistics about properties
+    Uses one GROUP BY query for the category counts and one aggregate query
+    for the totals instead of a COUNT per category
+    Results are cached for PROPERTIES_CACHE_TIMEOUT and cleared with the
+    other property keys
     """
-    total_properties = Property.objects.count()
+    cached_stats = cache.get(PROPERTY_STATS_CACHE_KEY)
+    if cached_stats is not None:
+        return cached_stats
     
-    # Count by category
-    categories = dict(Property.PROPERTY_CATEGORIES)
-    category_stats = {}
-    for category_code, category_name in categories.items():
-        count = Property.objects.filter(category=category_code).count()
-        category_stats[category_name] = count
+    category_counts = dict(
+        Property.objects.order_by().values_list('category').annotate(c=Count('id'))
+    )
+    category_stats = {
+        category_name: category_counts.get(category_code, 0)
+        for category_code, category_name in _CATEGORY_LABELS.items()
+    }
     
-    # Average price
-    avg_price = Property.objects.aggregate(
-        avg_price=models.Avg('price_per_night')
-    )['avg_price'] or 0
+    totals = Property.objects.aggregate(
+        total=Count('id'),
+        avg_price=Avg('price_per_night'),
+        max_price=Max('price_per_night'),
+    )
     
-    # Most expensive property
-    most_expensive = Property.objects.order_by('-price_per_night').first()
+    # Most expensive property (only looked up when the table is not empty)
+    most_expensive_title = None
+    if totals['max_price'] is not None:
+        most_expensive_title = Property.objects.filter(
+            price_per_night=totals['max_price']
+        ).values_list('title', flat=True).first()
     
-    return {
-        'total_properties': total_properties,
+    stats = {
+        'total_properties': totals['total'],
         'category_stats': category_stats,
-        'average_price': round(avg_price, 2),
-        'most_expensive_property': most_expensive.title if most_expensive else None,
-        'max_price': most_expensive.price_per_night if most_expensive else 0
+        'average_price': round(totals['avg_price'] or 0, 2),
+        'most_expensive_property': most_expensive_title,
+        'max_price': totals['max_price'] or 0
     }
+    cache.set(PROPERTY_STATS_CACHE_KEY, stats, PROPERTIES_CACHE_TIMEOUT)
+    
+    return stats
+
+# created_at must stay last; _export_rows swaps in a formatted column
+EXPORT_FIELDNAMES = (
+    'id', 'title', 'description', 'price_per_night', 'bedrooms',
+    'bathrooms', 'guests', 'country', 'country_code', 'category',
+    'favorited', 'created_at'
+)
+
+def _export_rows():
+    """
+    Iterate export rows as plain tuples straight from the database in chunks
+    created_at is formatted by Postgres (the connection runs in UTC), so
+    rows need no per-row Python work before reaching csv.writer
+    Exports bypass get_all_properties so they neither load the whole table
+    into memory nor fill the cache with a one-off read
+    """
+    columns = EXPORT_FIELDNAMES[:-1] + ('created_at_display',)
+    return Property.objects.order_by('-created_at').annotate(
+        created_at_display=Func(
+            F('created_at'), Value('YYYY-MM-DD HH24:MI:SS'),
+            function='to_char', output_field=CharField()
+        )
+    ).values_list(*columns).iterator(chunk_size=2000)
 
 def export_properties_to_csv(file_path):
     """
     Export all properties to CSV file
     """
     import csv
-    from django.http import HttpResponse
-    
-    properties = get_all_properties()  # Use cached version if available
     
     with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = [
-            'id', 'title', 'description', 'price_per_night', 'bedrooms',
-            'bathrooms', 'guests', 'country', 'country_code', 'category',
-            'favorited', 'created_at'
-        ]
-        
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        
-        for prop in properties:
-            writer.writerow({
-                'id': prop.id,
-                'title': prop.title,
-                'description': prop.description,
-                'price_per_night': prop.price_per_night,
-                'bedrooms': prop.bedrooms,
-                'bathrooms': prop.bathrooms,
-                'guests': prop.guests,
-                'country': prop.country,
-                'country_code': prop.country_code,
-                'category': prop.category,
-                'favorited': prop.favorited,
-                'created_at': prop.created_at.strftime('%Y-%m-%d %H:%M:%S')
-            })
+        writer = csv.writer(csvfile)
+        writer.writerow(EXPORT_FIELDNAMES)
+        writer.writerows(_export_rows())
     
     return file_path
 
+class _Echo:
+    """
+    File-like object whose write() hands the value back, so csv.writer
+    output can be yielded to a streaming response
+    """
+    def write(self, value):
+        return value
+
+def stream_properties_csv(filename='properties.csv'):
+    """
+    Export all properties as a streamed CSV HTTP response
+    Memory use stays at one database chunk and the first bytes are sent
+    before the whole table has been read
+    """
+    import csv
+    from django.http import StreamingHttpResponse
+    
+    writer = csv.writer(_Echo())
+    
+    def generate():
+        yield writer.writerow(EXPORT_FIELDNAMES)
+        for row in _export_rows():
+            yield writer.writerow(row)
+    
+    response = StreamingHttpResponse(generate(), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+IMPORT_BATCH_SIZE = 1000
+
+# Columns overwritten when an imported title already exists
+IMPORT_UPDATE_FIELDS = [
+    'description', 'price_per_night', 'bedrooms', 'bathrooms', 'guests',
+    'country', 'country_code', 'category', 'favorited', 'updated_at'
+]
+
+def _iter_import_rows(rows, country_codes, errors):
+    """
+    Yield validated, type-coerced Property field values for each CSV row
+    Rows that fail are skipped and reported in errors
+    """
+    for row_num, row in enumerate(rows, 2):  # Start from 2 (header is row 1)
+        get = row.get
+        
+        # Validate required fields
+        missing_fields = [field for field in REQUIRED_IMPORT_FIELDS if not get(field)]
+        if missing_fields:
+            for field in missing_fields:
+                errors.append(f"Row {row_num}: Missing required field '{field}'")
+            continue
+        
+        try:
+            country = row['country']
+            values = {
+                'title': row['title'],
+                'description': get('description', ''),
+                'price_per_night': Decimal(row['price_per_night']),
+                'bedrooms': int(row['bedrooms']),
+                'bathrooms': int(row['bathrooms']),
+                'guests': int(row['guests']),
+                'country': country,
+                'country_code': get('country_code') or country_codes.get(country) or '',
+                'category': get('category', 'house'),
+                'favorited': get('favorited', '').lower() == 'true'
+            }
+            validate_property_data(values)
+        except ValidationError as e:
+            for field, messages in e.message_dict.items():
+                errors.append(f"Row {row_num}: {field}: {' '.join(messages)}")
+            continue
+        except Exception as e:
+            errors.append(f"Row {row_num}: {str(e)}")
+            continue
+        
+        yield values
+
 def import_properties_from_csv(file_path):
     """
     Import properties from CSV file and clear cache
+    Rows are upserted by title with bulk_create in batches, so the import
+    costs one INSERT ... ON CONFLICT per batch instead of a SELECT and an
+    INSERT/UPDATE per row, and the cache is cleared once at the end
     """
     import csv
     from django.db import transaction
@@ -346,39 +1069,38 @@ def import_properties_from_csv(file_path):
     
     try:
         with open(file_path, 'r', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
+            rows = list(csv.DictReader(csvfile))
+        
+        # Resolve all missing country codes up front in one batch
+        country_codes = get_country_codes(
+            row['country'] for row in rows
+            if row.get('country') and not row.get('country_code')
+        )
+        
+        # Later rows win when a title appears more than once, as they did
+        # with update_or_create; a batch cannot upsert the same row twice
+        properties_by_title = {
+            values['title']: Property(**values)
+            for values in _iter_import_rows(rows, country_codes, errors)
+        }
+        
+        if properties_by_title:
+            existing_titles = set(
+                Property.objects.filter(
+                    title__in=list(properties_by_title)
+                ).values_list('title', flat=True)
+            )
             
             with transaction.atomic():
-                for row_num, row in enumerate(reader, 2):  # Start from 2 (header is row 1)
-                    try:
-                        # Validate required fields
-                        required_fields = ['title', 'price_per_night', 'bedrooms', 'bathrooms', 'guests', 'country']
-                        for field in required_fields:
-                            if not row.get(field):
-                                errors.append(f"Row {row_num}: Missing required field '{field}'")
-                                continue
-                        
-                        # Create or update property
-                        property, created = Property.objects.update_or_create(
-                            title=row['title'],
-                            defaults={
-                                'description': row.get('description', ''),
-                                'price_per_night': float(row['price_per_night']),
-                                'bedrooms': int(row['bedrooms']),
-                                'bathrooms': int(row['bathrooms']),
-                                'guests': int(row['guests']),
-                                'country': row['country'],
-                                'country_code': row.get('country_code') or get_country_code(row['country']),
-                                'category': row.get('category', 'house'),
-                                'favorited': row.get('favorited', '').lower() == 'true'
-                            }
-                        )
-                        
-                        if created:
-                            imported_count += 1
-                            
-                    except Exception as e:
-                        errors.append(f"Row {row_num}: {str(e)}")
+                Property.objects.bulk_create(
+                    list(properties_by_title.values()),
+                    batch_size=IMPORT_BATCH_SIZE,
+                    update_conflicts=True,
+                    unique_fields=['title'],
+                    update_fields=IMPORT_UPDATE_FIELDS,
+                )
+            
+            imported_count = len(properties_by_title.keys() - existing_titles)
     
     except Exception as e:
         errors.append(f"File error: {str(e)}")
@@ -396,9 +1118,19 @@ def monitor_cache_performance():
     """
     Monitor cache performance and log metrics regularly
     This can be called from a Celery periodic task or management command
+    Only one worker per MONITOR_LOCK_TIMEOUT window logs the findings
     """
     metrics = get_redis_cache_metrics()
     
+    try:
+        first_in_window = cache.add(MONITOR_LOCK_KEY, '1', MONITOR_LOCK_TIMEOUT)
+    except Exception as e:
+        # Without the cache every worker logs, rather than none of them
+        logger.warning(f"Could not take the cache monitor lock: {e}")
+        first_in_window = True
+    if not first_in_window:
+        return metrics
+    
     # Log warning if hit ratio is low
     if metrics.get('hit_ratio', 0) < 0.7:  # 70% hit ratio threshold
         logger.warning(
@@ -408,8 +1140,14 @@ def monitor_cache_performance():
     
     # Log warning if memory usage is high
     if metrics.get('used_memory', 0) > 0 and 'error' not in metrics:
-        # This would need actual maxmemory configuration to calculate properly
-        logger.info(f"Current memory usage: {metrics['used_memory_human']}")
+        memory_usage_percentage = metrics.get('memory_usage_percentage')
+        if memory_usage_percentage is not None and memory_usage_percentage > 90:
+            logger.warning(
+                f"High cache memory usage: {memory_usage_percentage}% of maxmemory "
+                f"({metrics['used_memory_human']}). Keys may start being evicted."
+            )
+        else:
+            logger.info(f"Current memory usage: {metrics['used_memory_human']}")
     
     return metrics
     
@@ -1,13 +1,57 @@
-from django.http import JsonResponse
-from django.views.decorators.cache import cache_page
-from .utils import getallproperties  # import the new function
-
-@cache_page(60 * 15)
-def property_list(request):
-    properties = getallproperties()  # use the low-level cached function
-    return JsonResponse({"data": properties})
+import gzip
+import re
 
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition
+from .utils import (
+    PropertyListBodyStream,
+    acquire_property_list_refill_lock,
+    get_cached_property_list_body,
+    get_property_list_generation,
+    get_property_list_etag,
+    stream_properties_csv,
+    stream_property_list_body,
+    wait_for_property_list_body,
+)
 
+accepts_gzip_re = re.compile(r"\bgzip\b")
 
+def property_list_etag(request):
+    return get_property_list_etag()
 
+# Repeat clients get an empty 304 Not Modified instead of the full body.
+# No Last-Modified: the latest updated_at doesn't move when a row is deleted
+@condition(etag_func=property_list_etag)
+def property_list(request):
+    # Served from the cached, already-encoded body; unlike cache_page this
+    # cache is cleared whenever a property changes
+    generation = get_property_list_generation()
+    body = get_cached_property_list_body(generation)
+    has_lock = body is None and acquire_property_list_refill_lock(generation)
+    if body is None and not has_lock:
+        # Another worker is streaming this generation; wait for its body
+        body = wait_for_property_list_body(generation)
+    if has_lock:
+        # Cache miss: stream from the database, which also refills the cache
+        response = StreamingHttpResponse(
+            PropertyListBodyStream(generation), content_type="application/json"
+        )
+    elif body is None:
+        # Read the rows now rather than serve the stale shard copy, which
+        # can predate the ETag already computed for this response
+        response = StreamingHttpResponse(
+            stream_property_list_body(generation, cache_body=False),
+            content_type="application/json",
+        )
+    elif accepts_gzip_re.search(request.headers.get("Accept-Encoding", "")):
+        # The cached body is gzip data already, so send it as is
+        response = HttpResponse(body, content_type="application/json")
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = HttpResponse(gzip.decompress(body), content_type="application/json")
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
 
+def property_export_csv(request):
+    return stream_properties_csv()